@@ -1,16 +1,21 @@
 from nicegui import ui, app
-from io import StringIO
+from datetime import timedelta
 import pandas as pd
-from util.flights import load_flights_csv, compute_metrics, filter_flights_by_date_range
-from util.geo import load_airports
+from util.flights import (load_flights_csv, compute_metrics_cached, filter_flights_by_date_range,
+                          categorize_flight_columns, register_flights_df)
 from util.share import create_share, load_shared_dataset, get_share_url, validate_share_id
-from util.storage import save_dataset
+from util.storage import save_dataset, load_dataset_stats_only
 from pages.dashboard import build_dashboard
 from pages.upload import build_upload_page
 
-# In-memory storage for session data (avoids JSON serialization issues)
-session_data = {}
-dashboard_container = None
+# Session data lives in app.storage.tab (per browser tab, in-memory, so it can hold
+# DataFrames) and the dashboard container in app.storage.client (per page instance).
+# In-memory tab storage outlives closed tabs until it's pruned, so keep uploads for an
+# hour after their last change instead of NiceGUI's default of 30 days.
+app.storage.max_tab_storage_age = timedelta(hours=1).total_seconds()
+if app.storage.redis_url:
+    # Redis-backed tab storage must be JSON-serializable, which DataFrames are not
+    raise RuntimeError('Sendy keeps DataFrames in app.storage.tab and does not support NICEGUI_REDIS_URL')
 
 app.add_static_files('/static', 'static')
 
@@ -27,31 +32,46 @@ ui.add_head_html("""
 <meta name="twitter:image" content="https://sendy.dariel.us/static/cover.png">
 """, shared=True)
 
+def get_filtered_flights(start_date, end_date):
+    """Derive the current view of the uploaded flights for a date range
+
+    With the sorted date index this is a slice sharing buffers with the original,
+    so the filtered view is never stored separately in the session.
+    """
+    flights_df_original = app.storage.tab.get('flights_df_original')
+    if flights_df_original is None:
+        return None
+
+    return filter_flights_by_date_range(flights_df_original, start_date, end_date,
+                                        date_index=app.storage.tab.get('_date_index'))
+
+
 def update_dashboard_view():
     """Update dashboard with filtered data based on date range"""
-    global dashboard_container
-
+    dashboard_container = app.storage.client.get('dashboard_container')
     if dashboard_container is None:
         return
 
     # Get original data
-    flights_df_original = session_data.get('flights_df_original')
+    flights_df_original = app.storage.tab.get('flights_df_original')
     if flights_df_original is None:
         return
 
     # Get date range from session
-    start_date = session_data.get('filter_start_date')
-    end_date = session_data.get('filter_end_date')
+    start_date = app.storage.tab.get('filter_start_date')
+    end_date = app.storage.tab.get('filter_end_date')
 
-    # Filter data
-    filtered_df = filter_flights_by_date_range(flights_df_original, start_date, end_date)
+    # Skip the rebuild if this range is already on screen
+    filter_sig = (start_date, end_date)
+    if filter_sig == app.storage.tab.get('_last_filter_sig') and dashboard_container.default_slot.children:
+        return
 
-    # Recompute metrics
-    flight_stats = compute_metrics(filtered_df)
+    # Filter data and recompute metrics (cached for previously seen ranges)
+    flight_stats = compute_metrics_cached(app.storage.tab.get('dataset_key'), start_date, end_date)
 
     # Update session data with filtered results
-    session_data['flights_df'] = filtered_df
-    session_data['flight_stats'] = flight_stats
+    app.storage.tab['flight_stats'] = flight_stats
+    app.storage.tab['_last_filter_sig'] = filter_sig
 
     # Rebuild dashboard
     dashboard_container.clear()
@@ -61,9 +81,9 @@ def update_dashboard_view():
 
 def create_share_link():
     """Create a shareable link for the current dataset"""
-    # Get filtered data from session storage
-    flights_df = session_data.get('flights_df')
-    flight_stats = session_data.get('flight_stats')
+    # Derive filtered data from the original upload and the current filter
+    flights_df = get_filtered_flights(app.storage.tab.get('filter_start_date'), app.storage.tab.get('filter_end_date'))
+    flight_stats = app.storage.tab.get('flight_stats')
 
     if flights_df is None or not flight_stats:
         ui.notify('No data to share. Please upload a CSV first.', type='warning')
@@ -82,8 +102,8 @@ def create_share_link():
                 ui.separator()
 
                 # Show date range info if filtered
-                start_date = session_data.get('filter_start_date')
-                end_date = session_data.get('filter_end_date')
+                start_date = app.storage.tab.get('filter_start_date')
+                end_date = app.storage.tab.get('filter_end_date')
                 if start_date or end_date:
                     date_info = f"Date range: {start_date or 'All'} to {end_date or 'All'}"
                     ui.label(date_info).classes('text-body2 text-grey mt-2')
@@ -101,8 +121,8 @@ def create_share_link():
 
                         # Get date range if filtered
                         date_range = None
-                        start_date = session_data.get('filter_start_date')
-                        end_date = session_data.get('filter_end_date')
+                        start_date = app.storage.tab.get('filter_start_date')
+                        end_date = app.storage.tab.get('filter_end_date')
                         if start_date or end_date:
                             date_range = {
                                 'start': start_date,
@@ -164,15 +184,27 @@ def index():
     def handle_upload(flights_df: pd.DataFrame):
         """Handle successful CSV upload"""
         try:
-            # Compute metrics
-            flight_stats = compute_metrics(flights_df)
-
-            # Store in session data (simple dict, no persistence)
-            session_data['flights_df_original'] = flights_df  # Keep original unfiltered data
-            session_data['flights_df'] = flights_df
-            session_data['flight_stats'] = flight_stats
-            session_data['filter_start_date'] = None  # Reset filters
-            session_data['filter_end_date'] = None
+            # Sort chronologically once so date filters can binary search the Date column
+            date_index = None
+            if 'Date' in flights_df.columns:
+                flights_df['Date'] = pd.to_datetime(flights_df['Date'], errors='coerce')
+                flights_df = flights_df.sort_values('Date', kind='stable').reset_index(drop=True)
+                date_index = flights_df['Date'].values.astype('datetime64[ns]')
+
+            categorize_flight_columns(flights_df)
+
+            # Compute metrics (cached per date range for this upload)
+            dataset_key = register_flights_df(flights_df)
+            flight_stats = compute_metrics_cached(dataset_key)
+
+            # Store in per-tab session data (in memory, no persistence)
+            app.storage.tab['dataset_key'] = dataset_key
+            app.storage.tab['flights_df_original'] = flights_df  # Keep original unfiltered data
+            app.storage.tab['flight_stats'] = flight_stats
+            app.storage.tab['_date_index'] = date_index
+            app.storage.tab['_last_filter_sig'] = (None, None)
+            app.storage.tab['filter_start_date'] = None  # Reset filters
+            app.storage.tab['filter_end_date'] = None
 
             ui.notify(f'Successfully loaded {len(flights_df)} flights!', type='positive')
 
@@ -189,15 +221,16 @@ def index():
 
 
 @ui.page('/dashboard')
-def dashboard():
+async def dashboard():
     """Dashboard page - shows flight statistics and visualizations"""
-    global dashboard_container
-
     ui.colors(primary='#11b1ff')
 
+    # Tab storage is only available once the client has connected
+    await ui.context.client.connected()
+
     # Get data from session storage
-    flight_stats = session_data.get('flight_stats')
-    flights_df = session_data.get('flights_df_original')
+    flight_stats = app.storage.tab.get('flight_stats')
+    flights_df = app.storage.tab.get('flights_df_original')
 
     with ui.header().classes('items-center justify-between'):
         ui.label('Sendy').classes('text-h4 font-bold')
@@ -228,8 +261,8 @@ def dashboard():
 
                     def apply_filter():
                         try:
-                            session_data['filter_start_date'] = start_input.value if start_input.value else None
-                            session_data['filter_end_date'] = end_input.value if end_input.value else None
+                            app.storage.tab['filter_start_date'] = start_input.value if start_input.value else None
+                            app.storage.tab['filter_end_date'] = end_input.value if end_input.value else None
                             update_dashboard_view()
                             ui.notify('Date filter applied', type='positive')
                         except Exception as e:
@@ -238,8 +271,8 @@ def dashboard():
                     def reset_filter():
                         start_input.value = ''
                         end_input.value = ''
-                        session_data['filter_start_date'] = None
-                        session_data['filter_end_date'] = None
+                        app.storage.tab['filter_start_date'] = None
+                        app.storage.tab['filter_end_date'] = None
                         update_dashboard_view()
                         ui.notify('Filter reset', type='info')
 
@@ -250,6 +283,7 @@ def dashboard():
 
         # Dashboard content container
         dashboard_container = ui.column().classes('w-full')
+        app.storage.client['dashboard_container'] = dashboard_container
         with dashboard_container:
             build_dashboard(flight_stats)
 
@@ -282,10 +316,16 @@ def view_shared(share_id: str):
             ui.button('Go to Home', on_click=lambda: ui.navigate.to('/')).classes('mt-4')
             return
 
-        # Load the shared dataset
-        shared_df, shared_stats = load_shared_dataset(share_id)
+        # Get show_flight_list preference from share info (default to True for backwards compatibility)
+        show_flight_list = share_info.get('show_flight_list', True) if share_info else True
 
-        if shared_df is None or not shared_stats:
+        # Load the shared dataset; without the flight table only the stats are needed
+        if show_flight_list:
+            _, shared_stats = load_shared_dataset(share_id)
+        else:
+            shared_stats = load_dataset_stats_only(share_id)
+
+        if not shared_stats:
             ui.label('Error Loading Shared Data').classes('text-h4 text-red')
             ui.label('Unable to load the shared flight data.').classes('text-body1 mt-2')
             ui.button('Go to Home', on_click=lambda: ui.navigate.to('/')).classes('mt-4')
@@ -312,14 +352,7 @@ def view_shared(share_id: str):
         ui.label(flight_count_text).classes('text-body1 text-grey')
         ui.separator()
 
-        # Get show_flight_list preference from share info (default to True for backwards compatibility)
-        show_flight_list = share_info.get('show_flight_list', True) if share_info else True
-
         build_dashboard(shared_stats, show_flight_list=show_flight_list)
 
 
-# Load airports on startup
-load_airports()
-
-
 ui.run(title='Sendy', port=8080, favicon="static/favicon.png")
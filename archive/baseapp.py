@@ -1,91 +1,101 @@
 from nicegui import ui
+import numpy as np
 import pandas as pd
-from math import radians, cos, sin, asin, sqrt
-from collections import Counter
 import plotly.graph_objects as go
+from pathlib import Path
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+AIRPORTS_PARQUET = 'data/Airports.parquet'
 
 # Global variables to store data
 airports_df = None
+_coord_map = {}
+_country_map = {}
 flights_df = None
 flight_stats = {}
 
 
+@njit(cache=True, fastmath=True)
 def haversine(lon1, lat1, lon2, lat2):
     """Calculate the great circle distance between two points on earth (specified in decimal degrees)"""
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
+    lon1 = np.radians(lon1)
+    lat1 = np.radians(lat1)
+    lon2 = np.radians(lon2)
+    lat2 = np.radians(lat2)
     dlon = lon2 - lon1
     dlat = lat2 - lat1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    c = 2 * np.arcsin(np.sqrt(a))
     km = 6371 * c
     miles = km * 0.621371
     return miles
 
 
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def haversine_arr(lon1, lat1, lon2, lat2):
+        """Calculate great circle distances for arrays of points, in parallel"""
+        out = np.empty(lon1.shape[0])
+        for i in prange(lon1.shape[0]):
+            out[i] = haversine(lon1[i], lat1[i], lon2[i], lat2[i])
+        return out
+else:
+    # Without numba the NumPy ufuncs in haversine already work on whole arrays
+    haversine_arr = haversine
+
+
 def load_airports():
-    """Load airport data from CSV"""
-    global airports_df
+    """Load airport data from CSV and build IATA code lookup maps"""
+    global airports_df, _coord_map, _country_map
     try:
-        airports_df = pd.read_csv('data/Airports.csv')
+        # Parse the CSV once and cache it as parquet for faster subsequent starts
+        if Path(AIRPORTS_PARQUET).exists():
+            airports_df = pd.read_parquet(AIRPORTS_PARQUET)
+        else:
+            airports_df = pd.read_csv(
+                'data/Airports.csv',
+                engine='pyarrow',
+                usecols=['iata_code', 'latitude_deg', 'longitude_deg', 'iso_country']
+            )
+            try:
+                airports_df.to_parquet(AIRPORTS_PARQUET, compression='zstd')
+            except Exception as e:
+                print(f"Could not cache airports as parquet: {e}")
+
+        # Index by IATA code once so lookups are O(1) instead of a full scan
+        indexed = airports_df.dropna(subset=['iata_code']).drop_duplicates('iata_code').set_index('iata_code')
+        _coord_map = dict(zip(indexed.index, zip(indexed['latitude_deg'], indexed['longitude_deg'])))
+        _country_map = indexed['iso_country'].to_dict()
         print(f"Loaded {len(airports_df)} airports")
     except Exception as e:
         print(f"Error loading airports: {e}")
 
 
-def parse_datetime(date_str):
-    """Parse datetime from string"""
-    if pd.isna(date_str) or date_str == '':
-        return None
-    try:
-        return pd.to_datetime(date_str)
-    except:
-        return None
-
-
-def calculate_flight_time(takeoff, landing):
-    """Calculate flight time in hours"""
-    if takeoff is None or landing is None:
-        return 0
-    try:
-        diff = landing - takeoff
-        return diff.total_seconds() / 3600
-    except:
-        return 0
-
-
-def calculate_delay(scheduled, actual):
-    """Calculate delay in hours"""
-    if scheduled is None or actual is None:
-        return 0
-    try:
-        diff = actual - scheduled
-        return max(0, diff.total_seconds() / 3600)
-    except:
-        return 0
-
-
 def get_airport_coords(airport_code):
     """Get coordinates for an airport by IATA code"""
-    if airports_df is None or pd.isna(airport_code):
+    if pd.isna(airport_code):
         return None, None
 
-    airport = airports_df[airports_df['iata_code'] == airport_code]
-    if len(airport) == 0:
-        return None, None
-
-    return airport.iloc[0]['latitude_deg'], airport.iloc[0]['longitude_deg']
+    return _coord_map.get(airport_code, (None, None))
 
 
 def get_airport_country(airport_code):
     """Get country for an airport by IATA code"""
-    if airports_df is None or pd.isna(airport_code):
+    if pd.isna(airport_code):
         return None
 
-    airport = airports_df[airports_df['iata_code'] == airport_code]
-    if len(airport) == 0:
-        return None
-
-    return airport.iloc[0]['iso_country']
+    return _country_map.get(airport_code)
 
 
 def analyze_flights(df):
@@ -94,79 +104,88 @@ def analyze_flights(df):
 
     stats = {}
 
+    # Low-cardinality string columns are much cheaper to count and merge as categoricals
+    for col in ('From', 'To', 'Airline', 'Aircraft Type Name'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
     # Total flights
     stats['total_flights'] = len(df)
 
-    # Parse datetime columns
-    df['Takeoff_Actual'] = df['Take off (Actual)'].apply(parse_datetime)
-    df['Landing_Actual'] = df['Landing (Actual)'].apply(parse_datetime)
-    df['Gate_Departure_Scheduled'] = df['Gate Departure (Scheduled)'].apply(parse_datetime)
-    df['Gate_Departure_Actual'] = df['Gate Departure (Actual)'].apply(parse_datetime)
-    df['Gate_Arrival_Scheduled'] = df['Gate Arrival (Scheduled)'].apply(parse_datetime)
-    df['Gate_Arrival_Actual'] = df['Gate Arrival (Actual)'].apply(parse_datetime)
-
-    # Calculate distances and flight times
+    # Parse datetime columns (vectorized, Flighty exports ISO 8601 timestamps)
+    datetime_columns = {
+        'Takeoff_Actual': 'Take off (Actual)',
+        'Landing_Actual': 'Landing (Actual)',
+        'Gate_Departure_Scheduled': 'Gate Departure (Scheduled)',
+        'Gate_Departure_Actual': 'Gate Departure (Actual)',
+        'Gate_Arrival_Scheduled': 'Gate Arrival (Scheduled)',
+        'Gate_Arrival_Actual': 'Gate Arrival (Actual)',
+    }
+    # Parse all six columns in a single pass so repeated timestamps share one cache
+    raw_values = df[list(datetime_columns.values())].to_numpy(dtype=object).ravel()
+    parsed = pd.to_datetime(pd.Series(raw_values), errors='coerce', cache=True, format='ISO8601')
+    parsed_values = parsed.to_numpy().reshape(len(df), len(datetime_columns))
+    for i, parsed_col in enumerate(datetime_columns):
+        df[parsed_col] = parsed_values[:, i]
+
+    # Calculate distances in one vectorized pass over all routes
     total_distance = 0
-    total_flight_time = 0
-    total_delay = 0
     routes = []
 
-    for _, row in df.iterrows():
-        # Get coordinates
-        from_lat, from_lon = get_airport_coords(row['From'])
-        to_lat, to_lon = get_airport_coords(row['To'])
-
-        if from_lat and from_lon and to_lat and to_lon:
-            distance = haversine(from_lon, from_lat, to_lon, to_lat)
-            total_distance += distance
-            routes.append((row['From'], row['To'], distance))
-
-        # Calculate flight time
-        flight_time = calculate_flight_time(row['Takeoff_Actual'], row['Landing_Actual'])
-        total_flight_time += flight_time
-
-        # Calculate delays
-        delay = calculate_delay(row['Gate_Departure_Scheduled'], row['Gate_Departure_Actual'])
-        total_delay += delay
+    if airports_df is not None:
+        coords = airports_df[['iata_code', 'latitude_deg', 'longitude_deg']].dropna().drop_duplicates('iata_code')
+        merged = df[['From', 'To']].merge(
+            coords.rename(columns={'iata_code': 'From', 'latitude_deg': 'from_lat', 'longitude_deg': 'from_lon'}),
+            on='From'
+        ).merge(
+            coords.rename(columns={'iata_code': 'To', 'latitude_deg': 'to_lat', 'longitude_deg': 'to_lon'}),
+            on='To'
+        )
+
+        miles = haversine_arr(
+            merged['from_lon'].to_numpy(dtype=float),
+            merged['from_lat'].to_numpy(dtype=float),
+            merged['to_lon'].to_numpy(dtype=float),
+            merged['to_lat'].to_numpy(dtype=float)
+        )
+
+        total_distance = float(miles.sum())
+        routes = list(zip(merged['From'], merged['To'], miles.tolist()))
+
+    # Calculate flight times and delays
+    total_flight_time = float((df['Landing_Actual'] - df['Takeoff_Actual']).dt.total_seconds().sum()) / 3600
+    total_delay = float((df['Gate_Departure_Actual'] - df['Gate_Departure_Scheduled']).dt.total_seconds().clip(lower=0).sum()) / 3600
 
     stats['total_distance'] = round(total_distance, 2)
     stats['total_flight_time'] = round(total_flight_time, 2)
     stats['total_delay'] = round(total_delay, 2)
 
     # Unique airports
-    airports_visited = set()
-    for airport in df['From'].dropna():
-        airports_visited.add(airport)
-    for airport in df['To'].dropna():
-        airports_visited.add(airport)
-    stats['airports_visited'] = sorted(list(airports_visited))
+    airports_visited = pd.unique(np.concatenate([
+        df['From'].dropna().to_numpy(dtype=object),
+        df['To'].dropna().to_numpy(dtype=object)
+    ]))
+    stats['airports_visited'] = np.sort(airports_visited).tolist()
     stats['total_airports'] = len(airports_visited)
 
     # Airlines
     airlines = df['Airline'].dropna().value_counts()
-    stats['airlines'] = airlines.to_dict()
+    stats['airlines'] = airlines.head(10).to_dict()
     stats['total_airlines'] = len(airlines)
     stats['top_airline'] = airlines.index[0] if len(airlines) > 0 else 'N/A'
 
     # Aircraft types
     aircraft = df['Aircraft Type Name'].dropna().value_counts()
-    stats['aircraft_types'] = aircraft.to_dict()
+    stats['aircraft_types'] = aircraft.head(10).to_dict()
     stats['most_flown_aircraft'] = aircraft.index[0] if len(aircraft) > 0 else 'N/A'
 
     # Top routes
-    route_counts = Counter()
-    for _, row in df.iterrows():
-        if not pd.isna(row['From']) and not pd.isna(row['To']):
-            route = f"{row['From']} → {row['To']}"
-            route_counts[route] += 1
-    stats['top_routes'] = dict(route_counts.most_common(10))
+    route_pairs = df[['From', 'To']].dropna()
+    routes_series = route_pairs['From'].astype(str) + ' → ' + route_pairs['To'].astype(str)
+    stats['top_routes'] = routes_series.value_counts().head(10).to_dict()
 
     # Countries
-    countries = set()
-    for airport in airports_visited:
-        country = get_airport_country(airport)
-        if country:
-            countries.add(country)
+    countries = {_country_map.get(a) for a in airports_visited if _country_map.get(a)}
     stats['countries'] = sorted(list(countries))
     stats['total_countries'] = len(countries)
 
@@ -184,10 +203,9 @@ def upload_csv(e):
 
     if e.content:
         try:
-            # Read CSV from uploaded content
-            from io import StringIO
-            content = e.content.read().decode('utf-8')
-            flights_df = pd.read_csv(StringIO(content))
+            # Read CSV straight from the uploaded bytes (decoded by the parser, not in Python)
+            from io import BytesIO
+            flights_df = pd.read_csv(BytesIO(e.content.read()), engine='pyarrow')
 
             # Analyze flights
             analyze_flights(flights_df)
@@ -253,12 +271,11 @@ def update_dashboard():
             with ui.card().classes('flex-1'):
                 airlines = flight_stats.get('airlines', {})
                 if airlines:
-                    airline_data = dict(list(airlines.items())[:10])
                     ui.echart({
                         'title': {'text': 'Top 10 Airlines'},
-                        'xAxis': {'type': 'category', 'data': list(airline_data.keys())},
+                        'xAxis': {'type': 'category', 'data': list(airlines.keys())},
                         'yAxis': {'type': 'value'},
-                        'series': [{'type': 'bar', 'data': list(airline_data.values())}]
+                        'series': [{'type': 'bar', 'data': list(airlines.values())}]
                     }).classes('w-full h-64')
 
             # Top routes chart
@@ -277,12 +294,11 @@ def update_dashboard():
         with ui.card().classes('w-full'):
             aircraft = flight_stats.get('aircraft_types', {})
             if aircraft:
-                aircraft_data = dict(list(aircraft.items())[:10])
                 ui.echart({
                     'title': {'text': 'Top 10 Aircraft Types'},
-                    'xAxis': {'type': 'category', 'data': list(aircraft_data.keys())},
+                    'xAxis': {'type': 'category', 'data': list(aircraft.keys())},
                     'yAxis': {'type': 'value'},
-                    'series': [{'type': 'bar', 'data': list(aircraft_data.values())}]
+                    'series': [{'type': 'bar', 'data': list(aircraft.values())}]
                 }).classes('w-full h-64')
 
         # Flight map
@@ -299,69 +315,58 @@ def create_flight_map():
         ui.label('No route data available')
         return
 
-    # Prepare data for plotting
-    flight_lines = []
-    airport_data = {}
-
-    for from_code, to_code, distance in routes:
-        from_lat, from_lon = get_airport_coords(from_code)
-        to_lat, to_lon = get_airport_coords(to_code)
-
-        if from_lat and from_lon and to_lat and to_lon:
-            flight_lines.append({
-                'from': from_code,
-                'to': to_code,
-                'from_lat': from_lat,
-                'from_lon': from_lon,
-                'to_lat': to_lat,
-                'to_lon': to_lon,
-                'distance': distance
-            })
-
-            # Track airports
-            if from_code not in airport_data:
-                airport_data[from_code] = {'lat': from_lat, 'lon': from_lon, 'count': 0}
-            airport_data[from_code]['count'] += 1
-
-            if to_code not in airport_data:
-                airport_data[to_code] = {'lat': to_lat, 'lon': to_lon, 'count': 0}
-            airport_data[to_code]['count'] += 1
-
-    if not flight_lines:
+    # Prepare data for plotting: attach coordinates to each route in one join
+    rdf = pd.DataFrame(routes, columns=['from_code', 'to_code', 'distance'])
+    codes = pd.unique(pd.concat([rdf['from_code'], rdf['to_code']]))
+    coords = pd.DataFrame(
+        [_coord_map.get(code, (np.nan, np.nan)) for code in codes],
+        index=codes,
+        columns=['lat', 'lon']
+    )
+    rdf = rdf.join(coords.add_prefix('from_'), on='from_code').join(coords.add_prefix('to_'), on='to_code').dropna()
+
+    if rdf.empty:
         ui.label('Unable to plot routes')
         return
 
+    # Count flights per airport
+    airport_counts = pd.concat([rdf['from_code'], rdf['to_code']]).value_counts()
+    airport_coords = coords.loc[airport_counts.index]
+
     # Create Plotly figure
     fig = go.Figure()
 
-    # Add flight routes as lines
-    for line in flight_lines:
-        fig.add_trace(go.Scattergeo(
-            lon=[line['from_lon'], line['to_lon']],
-            lat=[line['from_lat'], line['to_lat']],
-            mode='lines',
-            line=dict(width=1, color='rgba(51, 136, 255, 0.5)'),
-            hoverinfo='text',
-            text=f"{line['from']} → {line['to']}<br>{line['distance']:.0f} miles",
-            showlegend=False
-        ))
+    # Add flight routes as a single line trace, with NaN gaps separating the segments
+    lons = []
+    lats = []
+    texts = []
+    for line in rdf.itertuples(index=False):
+        label = f"{line.from_code} → {line.to_code}<br>{line.distance:.0f} miles"
+        lons.extend([line.from_lon, line.to_lon, np.nan])
+        lats.extend([line.from_lat, line.to_lat, np.nan])
+        texts.extend([label, label, None])
 
-    # Add airport markers
-    airport_lats = [data['lat'] for data in airport_data.values()]
-    airport_lons = [data['lon'] for data in airport_data.values()]
-    airport_names = list(airport_data.keys())
-    airport_counts = [data['count'] for data in airport_data.values()]
+    fig.add_trace(go.Scattergeo(
+        lon=lons,
+        lat=lats,
+        mode='lines',
+        line=dict(width=1, color='rgba(51, 136, 255, 0.5)'),
+        hoverinfo='text',
+        text=texts,
+        showlegend=False
+    ))
 
+    # Add airport markers
     fig.add_trace(go.Scattergeo(
-        lon=airport_lons,
-        lat=airport_lats,
+        lon=airport_coords['lon'].to_numpy(),
+        lat=airport_coords['lat'].to_numpy(),
         mode='markers',
         marker=dict(
-            size=[min(8 + count * 2, 20) for count in airport_counts],
+            size=np.minimum(8 + airport_counts.to_numpy() * 2, 20),
             color='#ff7800',
             line=dict(width=1, color='white')
         ),
-        text=[f"{name}<br>{count} flights" for name, count in zip(airport_names, airport_counts)],
+        text=[f"{name}<br>{count} flights" for name, count in airport_counts.items()],
         hoverinfo='text',
         name='Airports'
     ))
@@ -388,7 +393,7 @@ def create_flight_map():
     ui.plotly(fig).classes('w-full')
 
     # Add route summary
-    ui.label(f'Total unique routes: {len(flight_lines)} | Airports visited: {len(airport_data)}').classes('text-body2 text-grey mt-2')
+    ui.label(f'Total unique routes: {len(rdf)} | Airports visited: {len(airport_counts)}').classes('text-body2 text-grey mt-2')
 
 
 # Initialize app
@@ -1,3 +1,6 @@
+from itertools import islice
+import numpy as np
+import pandas as pd
 from nicegui import ui
 from ui_components.cards import stat_card, chart_card
 from ui_components.map import create_flight_map
@@ -36,11 +39,11 @@ def build_dashboard(stats, show_flight_list=True):
     ui.label('Top Airlines').classes('text-h5 mt-4')
 
     with ui.row().classes('w-full gap-4 flex-wrap'):
-        airlines = stats.get('airlines', {})
+        # New stats hold only the top 10; shares saved before that hold every airline
+        airlines = dict(islice(stats.get('airlines', {}).items(), 10))
         if airlines:
-            airline_data = dict(list(airlines.items())[:10])
             with ui.element().classes('w-full md:flex-1'):
-                chart_card('Top 10 Airlines', airline_data)
+                chart_card('Top 10 Airlines', airlines)
 
         # Top routes chart
         routes = stats.get('top_routes', {})
@@ -51,14 +54,13 @@ def build_dashboard(stats, show_flight_list=True):
     # Aircraft types chart
     ui.label('Top Aircraft Types').classes('text-h5 mt-4')
     with ui.card().classes('w-full'):
-        aircraft = stats.get('aircraft_types', {})
+        aircraft = dict(islice(stats.get('aircraft_types', {}).items(), 10))
         if aircraft:
-            aircraft_data = dict(list(aircraft.items())[:10])
             ui.echart({
                 'title': {'text': 'Top 10 Aircraft Types'},
                 'xAxis': {
                     'type': 'category',
-                    'data': list(aircraft_data.keys()),
+                    'data': list(aircraft.keys()),
                     'axisLabel': {
                         'rotate': 45,
                         'interval': 0
@@ -67,7 +69,7 @@ def build_dashboard(stats, show_flight_list=True):
                 'yAxis': {'type': 'value'},
                 'series': [{
                     'type': 'bar',
-                    'data': list(aircraft_data.values()),
+                    'data': list(aircraft.values()),
                     'label': {
                         'show': True,
                         'position': 'inside',
@@ -92,20 +94,17 @@ def build_dashboard(stats, show_flight_list=True):
         with ui.card().classes('w-full'):
             flights_df = stats.get('flights_data')
             if flights_df is not None and not flights_df.empty:
-                # Prepare table data
-                import pandas as pd
-                table_data = flights_df[['Date', 'Airline', 'Flight', 'From', 'To']].copy()
-
-                # Safely convert Date column to string format
-                try:
-                    # Ensure it's datetime first, then format
-                    table_data['Date'] = pd.to_datetime(table_data['Date']).dt.strftime('%Y-%m-%d')
-                except:
-                    # Fallback to simple string conversion if datetime conversion fails
-                    table_data['Date'] = table_data['Date'].astype(str)
-
-                # Create unique row IDs for proper pagination
-                table_data['row_id'] = range(len(table_data))
+                # Prepare table data (Date is already datetime for uploads; shared CSV datasets keep strings)
+                if pd.api.types.is_datetime64_any_dtype(flights_df['Date']):
+                    date_str = flights_df['Date'].dt.strftime('%Y-%m-%d')
+                else:
+                    date_str = flights_df['Date'].astype(str)
+
+                # Format dates and add unique row IDs for proper pagination, without an extra copy
+                table_data = flights_df[['Date', 'Airline', 'Flight', 'From', 'To']].assign(
+                    Date=date_str,
+                    row_id=np.arange(len(flights_df))
+                )
 
                 # Create table with pagination
                 columns = [
@@ -116,13 +115,32 @@ def build_dashboard(stats, show_flight_list=True):
                     {'name': 'destination', 'label': 'Destination', 'field': 'To', 'sortable': True, 'align': 'center'},
                 ]
 
-                rows = table_data.to_dict('records')
+                # Paginate server-side: only the visible page is converted and sent to the client
+                fields = {column['name']: column['field'] for column in columns}
+
+                def page_rows(pagination):
+                    sort_by = pagination.get('sortBy')
+                    page_data = table_data
+                    if sort_by in fields:
+                        page_data = page_data.sort_values(fields[sort_by], ascending=not pagination.get('descending'), kind='stable')
 
-                ui.table(
+                    rows_per_page = pagination.get('rowsPerPage') or len(page_data)
+                    start = (pagination.get('page', 1) - 1) * rows_per_page
+                    return page_data.iloc[start:start + rows_per_page].to_dict('records')
+
+                pagination = {'rowsPerPage': 10, 'sortBy': 'date', 'descending': True, 'page': 1, 'rowsNumber': len(table_data)}
+                table = ui.table(
                     columns=columns,
-                    rows=rows,
+                    rows=page_rows(pagination),
                     row_key='row_id',
-                    pagination={'rowsPerPage': 10, 'sortBy': 'date', 'descending': True}
+                    pagination=pagination
                 ).classes('w-full')
+
+                def handle_request(e):
+                    new_pagination = {**e.args['pagination'], 'rowsNumber': len(table_data)}
+                    table.rows = page_rows(new_pagination)
+                    table.pagination = new_pagination
+
+                table.on('request', handle_request)
             else:
                 ui.label('No flight data available')
\ No newline at end of file
@@ -1,6 +1,6 @@
 # upload page UI
 from nicegui import ui
-from io import StringIO
+from io import BytesIO
 import pandas as pd
 
 
@@ -28,18 +28,20 @@ def build_upload_page(on_upload_callback):
             async def handle_upload_event(e):
                 try:
                     # In NiceGUI 3.x, e.file is a SmallFileUpload object
-                    # We need to read its content and convert to StringIO
+                    # We need to read its content and wrap it in BytesIO
                     if not hasattr(e, 'file') or not e.file:
                         raise ValueError("No file was uploaded")
 
                     # Read the file content (async operation)
                     content_bytes = await e.file.read()
 
-                    # Decode to string
-                    content_str = content_bytes.decode('utf-8')
-
-                    # Parse CSV from StringIO
-                    flights_df = pd.read_csv(StringIO(content_str))
+                    # Parse CSV straight from the bytes with Arrow's multithreaded reader,
+                    # falling back to the default parser for files pyarrow rejects
+                    try:
+                        flights_df = pd.read_csv(BytesIO(content_bytes), engine='pyarrow')
+                    except Exception as parse_error:
+                        print(f"pyarrow CSV parse failed, retrying with default engine: {parse_error}")
+                        flights_df = pd.read_csv(BytesIO(content_bytes))
 
                     # Call the callback
                     on_upload_callback(flights_df)
@@ -0,0 +1,9 @@
+import pandas as pd
+from util.flights import load_flights_csv
+
+
+def test_load_flights_csv_parses_iso_dates():
+    df = load_flights_csv('data/FlightyExport.csv')
+
+    assert pd.api.types.is_datetime64_any_dtype(df['Date'])
+    assert df['Date'].iloc[0] == pd.Timestamp('2015-06-03')
@@ -0,0 +1,25 @@
+import orjson
+import pytest
+from util import share
+
+
+def test_iouring_reader_matches_thread_pool(tmp_path, monkeypatch):
+    pytest.importorskip('liburing')
+    paths = []
+    for i in range(300):  # More than one _IOURING_QUEUE_DEPTH batch
+        path = tmp_path / f'share{i}.json'
+        path.write_bytes(orjson.dumps({'share_id': f'share{i}', 'total_flights': i}))
+        paths.append(str(path))
+    paths.append(str(tmp_path / 'missing.json'))
+
+    raw_files = share._read_files_iouring(paths)
+    assert all(raw is not None for raw in raw_files[:-1])
+    assert raw_files[-1] is None
+
+    monkeypatch.setattr(share, 'USE_IOURING', True)
+    iouring_metadata = share._read_share_files(paths)
+    monkeypatch.setattr(share, 'USE_IOURING', False)
+    thread_pool_metadata = share._read_share_files(paths)
+
+    assert iouring_metadata == thread_pool_metadata
+    assert iouring_metadata[299] == {'share_id': 'share299', 'total_flights': 299}
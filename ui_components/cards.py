@@ -1,4 +1,6 @@
 # reusable UI widgets (cards, tables)
+import copy
+from functools import lru_cache
 from nicegui import ui
 
 
@@ -12,29 +14,50 @@ def stat_card(label, value, classes=''):
 def chart_card(title, chart_data, chart_type='bar', classes=''):
     """Create a card with an EChart visualization"""
     with ui.card().classes(f'flex-1 {classes}'):
-        ui.echart({
-            'title': {'text': title},
-            'xAxis': {
-                'type': 'category',
-                'data': list(chart_data.keys()),
-                'axisLabel': {
-                    'rotate': 45,
-                    'interval': 0
-                }
-            },
-            'yAxis': {'type': 'value'},
-            'series': [{
-                'type': chart_type,
-                'data': list(chart_data.values()),
-                'label': {
-                    'show': True,
-                    'position': 'inside',
-                    'rotate': 90,
-                    'formatter': '{c}'
-                }
-            }],
-            'grid': {
-                'bottom': '20%',
-                'containLabel': True
-            }
-        }).classes('w-full').style('min-height: 400px')
+        # ui.echart keeps the dict by reference, so each chart gets its own copy of the cached option
+        option = copy.deepcopy(_make_option(title, tuple(chart_data.keys()), tuple(chart_data.values()), chart_type))
+        ui.echart(option).classes('w-full').style('min-height: 400px')
+
+
+# Shared skeleton for bar-style chart options; _make_option only fills in the data
+_ECHART_TMPL = {
+    'animation': False,
+    'xAxis': {
+        'type': 'category',
+        'axisLabel': {
+            'rotate': 45,
+            'interval': 0,
+            'hideOverlap': True
+        }
+    },
+    'yAxis': {'type': 'value'},
+    'series': [{}],
+    'grid': {
+        'bottom': '20%',
+        'containLabel': True
+    }
+}
+
+# Rotated in-bar value labels are slow to lay out, so they're only shown on small charts
+_BAR_LABEL = {
+    'show': True,
+    'position': 'inside',
+    'rotate': 90,
+    'formatter': '{c}'
+}
+_MAX_LABELED_POINTS = 10
+
+
+@lru_cache(maxsize=32)
+def _make_option(title, keys, values, chart_type='bar'):
+    """Build the EChart option for a chart from the template, memoized on its title, data and type"""
+    series = {**_ECHART_TMPL['series'][0], 'type': chart_type, 'data': list(values)}
+    if len(values) <= _MAX_LABELED_POINTS:
+        series['label'] = _BAR_LABEL
+
+    return dict(
+        _ECHART_TMPL,
+        title={'text': title},
+        xAxis={**_ECHART_TMPL['xAxis'], 'data': list(keys)},
+        series=[series]
+    )
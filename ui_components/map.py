@@ -1,4 +1,5 @@
 # map component wrapper
+from functools import lru_cache
 from nicegui import ui
 import plotly.graph_objects as go
 from util.geo import get_airport_coords
@@ -12,11 +13,39 @@ def create_flight_map(stats):
         ui.label('No route data available')
         return
 
+    # Routes loaded from a shared dataset are JSON lists, so normalize to hashable tuples
+    map_figure = _build_map_figure(tuple(map(tuple, routes)))
+    if map_figure is None:
+        ui.label('Unable to plot routes')
+        return
+
+    fig, route_count, airport_count = map_figure
+
+    # Display using plotly in NiceGUI
+    ui.plotly(fig).classes('w-full')
+
+    # Add route summary
+    ui.label(f'Total unique routes: {route_count} | Airports visited: {airport_count}').classes('text-body2 text-grey mt-2')
+
+
+@lru_cache(maxsize=8)
+def _build_map_figure(routes):
+    """Build the flight map figure for a tuple of routes
+
+    Returns:
+        tuple: (figure, number of routes plotted, number of airports) or None if nothing can be plotted
+    """
+    # Collapse repeated flights so each route is drawn once, keeping the flight count
+    unique_routes = {}
+    for from_code, to_code, distance in routes:
+        route = unique_routes.setdefault((from_code, to_code), [distance, 0])
+        route[1] += 1
+
     # Prepare data for plotting
     flight_lines = []
     airport_data = {}
 
-    for from_code, to_code, distance in routes:
+    for (from_code, to_code), (distance, flights) in unique_routes.items():
         from_lat, from_lon = get_airport_coords(from_code)
         to_lat, to_lon = get_airport_coords(to_code)
 
@@ -34,29 +63,33 @@ def create_flight_map(stats):
             # Track airports
             if from_code not in airport_data:
                 airport_data[from_code] = {'lat': from_lat, 'lon': from_lon, 'count': 0}
-            airport_data[from_code]['count'] += 1
+            airport_data[from_code]['count'] += flights
 
             if to_code not in airport_data:
                 airport_data[to_code] = {'lat': to_lat, 'lon': to_lon, 'count': 0}
-            airport_data[to_code]['count'] += 1
+            airport_data[to_code]['count'] += flights
 
     if not flight_lines:
-        ui.label('Unable to plot routes')
-        return
+        return None
 
     # Create Plotly figure
     fig = go.Figure()
 
-    # Add flight routes as lines
+    # Add flight routes as a single line trace, with None gaps separating the segments
+    lons = []
+    lats = []
     for line in flight_lines:
-        fig.add_trace(go.Scattergeo(
-            lon=[line['from_lon'], line['to_lon']],
-            lat=[line['from_lat'], line['to_lat']],
-            mode='lines',
-            line=dict(width=1, color='rgba(51, 136, 255, 0.5)'),
-            hoverinfo='skip',  # Don't show tooltips for routes
-            showlegend=False
-        ))
+        lons.extend([line['from_lon'], line['to_lon'], None])
+        lats.extend([line['from_lat'], line['to_lat'], None])
+
+    fig.add_trace(go.Scattergeo(
+        lon=lons,
+        lat=lats,
+        mode='lines',
+        line=dict(width=1, color='rgba(51, 136, 255, 0.5)'),
+        hoverinfo='skip',  # Don't show tooltips for routes
+        showlegend=False
+    ))
 
     # Add airport markers
     airport_lats = [data['lat'] for data in airport_data.values()]
@@ -96,8 +129,4 @@ def create_flight_map(stats):
         margin=dict(l=0, r=0, t=40, b=0)
     )
 
-    # Display using plotly in NiceGUI
-    ui.plotly(fig).classes('w-full')
-
-    # Add route summary
-    ui.label(f'Total unique routes: {len(flight_lines)} | Airports visited: {len(airport_data)}').classes('text-body2 text-grey mt-2')
+    return fig, len(flight_lines), len(airport_data)
@@ -1,10 +1,49 @@
 # parse CSV, clean data, compute metrics
+import weakref
+from collections import OrderedDict
+from itertools import count
+import numpy as np
 import pandas as pd
-from collections import Counter
-from util.geo import get_airport_coords, get_airport_country, haversine
+from util.geo import get_airport_coords_arrays, get_airport_countries, haversine_vec
 
+try:
+    from util.geo_numba import haversine_nb
+except ImportError:
+    # numba is optional; fall back to the NumPy implementation
+    haversine_nb = None
 
-def filter_flights_by_date_range(df: pd.DataFrame, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+# Registered DataFrames for compute_metrics_cached, held weakly so the owner (e.g. the
+# session) controls their lifetime; keys are never reused, so cache entries can't go stale
+_DF_STORE = weakref.WeakValueDictionary()
+_df_keys = count()
+
+# Most recently used (df_key, start_date, end_date) -> (stats, positions of the active rows);
+# holds no DataFrames, so it never keeps a registered frame alive
+_METRICS_CACHE = OrderedDict()
+_METRICS_CACHE_SIZE = 16
+
+# Low-cardinality string columns that are stored as categoricals
+CATEGORY_COLUMNS = ('From', 'To', 'Airline', 'Aircraft Type Name')
+
+
+def categorize_flight_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert repeated string columns to categoricals so counts and groupbys hash integer codes.
+
+    Args:
+        df: DataFrame with flight data (modified in place)
+
+    Returns:
+        The same DataFrame
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def filter_flights_by_date_range(df: pd.DataFrame, start_date: str = None, end_date: str = None,
+                                 date_index: np.ndarray = None) -> pd.DataFrame:
     """
     Filter flights by date range.
 
@@ -12,38 +51,61 @@ def filter_flights_by_date_range(df: pd.DataFrame, start_date: str = None, end_d
         df: DataFrame with flight data
         start_date: Start date as string (YYYY-MM-DD) or None for no filter
         end_date: End date as string (YYYY-MM-DD) or None for no filter
+        date_index: Optional datetime64 array of df['Date'], sorted ascending with NaT last. When given,
+            the range is found by binary search and returned as a slice of df.
 
     Returns:
         Filtered DataFrame
     """
-    if start_date is None and end_date is None:
-        return df
-
     # Make sure Date column exists
     if 'Date' not in df.columns:
         return df
 
-    filtered_df = df.copy()
+    # Parse the bounds once; empty or unparseable bounds don't filter
+    start = _parse_filter_date(start_date, 'start')
+    end = _parse_filter_date(end_date, 'end')
+    if start is None and end is None:
+        return df
+
+    if date_index is not None:
+        # NaT sorts last; stop there so undated rows are dropped, as the mask below does
+        n_dated = int(np.searchsorted(date_index, np.datetime64('NaT'), side='left'))
+        lo = int(np.searchsorted(date_index, start, side='left')) if start is not None else 0
+        hi = int(np.searchsorted(date_index, end, side='right')) if end is not None else n_dated
+        return df.iloc[lo:max(lo, hi)]
+
+    # Build a single boolean mask over the dates, without copying the frame
+    dates = df['Date']
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    dates = dates.to_numpy(dtype='datetime64[ns]')
+
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= dates >= start
+    if end is not None:
+        mask &= dates <= end
 
-    # Ensure Date column is datetime type
-    if not pd.api.types.is_datetime64_any_dtype(filtered_df['Date']):
-        filtered_df['Date'] = pd.to_datetime(filtered_df['Date'])
+    return df.loc[mask]
+
+
+def _parse_filter_date(date_str: str, bound: str):
+    """Parse a date filter bound to datetime64, or None if it is empty or invalid"""
+    if not date_str or not date_str.strip():
+        return None
 
-    if start_date and start_date.strip():
-        try:
-            start = pd.to_datetime(start_date)
-            filtered_df = filtered_df[filtered_df['Date'] >= start]
-        except Exception as e:
-            print(f"Error parsing start date '{start_date}': {e}")
+    try:
+        return pd.to_datetime(date_str).to_datetime64()
+    except Exception as e:
+        print(f"Error parsing {bound} date '{date_str}': {e}")
+        return None
 
-    if end_date and end_date.strip():
-        try:
-            end = pd.to_datetime(end_date)
-            filtered_df = filtered_df[filtered_df['Date'] <= end]
-        except Exception as e:
-            print(f"Error parsing end date '{end_date}': {e}")
 
-    return filtered_df
+def _cancelled_mask(canceled: pd.Series) -> pd.Series:
+    """Boolean mask of cancelled flights; Canceled is parsed as bool, or kept as "TRUE"/"FALSE" strings"""
+    if pd.api.types.is_bool_dtype(canceled):
+        return canceled.fillna(False).astype(bool)
+    return canceled.astype(str).str.lower() == 'true'
 
 
 def load_flights_csv(path: str) -> pd.DataFrame:
@@ -53,97 +115,74 @@ def load_flights_csv(path: str) -> pd.DataFrame:
         "Take off (Actual)", "Landing (Scheduled)", "Landing (Actual)", "Gate Arrival (Scheduled)",
         "Gate Arrival (Actual)", "Aircraft Type Name", "Tail Number"
     ]
-    df = pd.read_csv(path)
-    df = df[columns]
+    # Select columns, parse dates and categorize repeated strings inside the parser
+    df = pd.read_csv(
+        path,
+        usecols=columns,
+        parse_dates=["Date"],
+        date_format="ISO8601",
+        dtype={col: "category" for col in CATEGORY_COLUMNS}
+    )
 
-    # Date cleaning
-    df["Date"] = pd.to_datetime(df["Date"], format="%m/%d/%y")
+    return df[columns]
 
 
-    return df
+def _active_flights(df: pd.DataFrame) -> tuple:
+    """
+    Drop cancelled flights and parse the actual/scheduled datetime columns.
 
+    Args:
+        df: DataFrame with flight data
 
-def parse_datetime(date_str):
-    """Parse datetime from string"""
-    if pd.isna(date_str) or date_str == '':
-        return None
-    try:
-        return pd.to_datetime(date_str)
-    except:
-        return None
+    Returns:
+        tuple: (copy of the non-cancelled flights with parsed datetime columns, number of cancelled flights)
+    """
+    cancelled_mask = _cancelled_mask(df['Canceled'])
+    df_active = df[~cancelled_mask].copy()
 
+    for src, dst in [('Take off (Actual)', 'Takeoff_Actual'),
+                     ('Landing (Actual)', 'Landing_Actual'),
+                     ('Gate Departure (Scheduled)', 'Gate_Departure_Scheduled'),
+                     ('Gate Departure (Actual)', 'Gate_Departure_Actual'),
+                     ('Gate Arrival (Scheduled)', 'Gate_Arrival_Scheduled'),
+                     ('Gate Arrival (Actual)', 'Gate_Arrival_Actual')]:
+        df_active[dst] = pd.to_datetime(df_active[src], errors='coerce', format='ISO8601')
 
-def calculate_flight_time(takeoff, landing):
-    """Calculate flight time in hours"""
-    if takeoff is None or landing is None:
-        return 0
-    # Check for NaN values
-    if pd.isna(takeoff) or pd.isna(landing):
-        return 0
-    try:
-        diff = landing - takeoff
-        return diff.total_seconds() / 3600
-    except:
-        return 0
-
-
-def calculate_delay(scheduled, actual):
-    """Calculate delay in hours"""
-    if scheduled is None or actual is None:
-        return 0
-    # Check for NaN values
-    if pd.isna(scheduled) or pd.isna(actual):
-        return 0
-    try:
-        diff = actual - scheduled
-        return max(0, diff.total_seconds() / 3600)
-    except:
-        return 0
+    return df_active, int(cancelled_mask.sum())
 
 
 def compute_metrics(df: pd.DataFrame):
     """Analyze flight data and calculate statistics"""
     stats = {}
 
-    # Count cancelled flights (Canceled column is "TRUE" or "FALSE" as string)
-    cancelled_mask = df['Canceled'].astype(str).str.upper() == 'TRUE'
-    stats['cancelled_flights'] = int(cancelled_mask.sum())
-
-    # Total flights (excluding cancelled)
-    df_active = df[~cancelled_mask].copy()
+    # Count cancelled flights and keep the active ones, with parsed datetime columns
+    df_active, cancelled_flights = _active_flights(df)
+    stats['cancelled_flights'] = cancelled_flights
     stats['total_flights'] = len(df_active)
 
-    # Parse datetime columns (use df_active for metrics)
-    df_active['Takeoff_Actual'] = df_active['Take off (Actual)'].apply(parse_datetime)
-    df_active['Landing_Actual'] = df_active['Landing (Actual)'].apply(parse_datetime)
-    df_active['Gate_Departure_Scheduled'] = df_active['Gate Departure (Scheduled)'].apply(parse_datetime)
-    df_active['Gate_Departure_Actual'] = df_active['Gate Departure (Actual)'].apply(parse_datetime)
-    df_active['Gate_Arrival_Scheduled'] = df_active['Gate Arrival (Scheduled)'].apply(parse_datetime)
-    df_active['Gate_Arrival_Actual'] = df_active['Gate Arrival (Actual)'].apply(parse_datetime)
-
-    # Calculate distances and flight times
-    total_distance = 0
-    total_flight_time = 0
-    total_delay = 0
-    routes = []
-
-    for _, row in df_active.iterrows():
-        # Get coordinates
-        from_lat, from_lon = get_airport_coords(row['From'])
-        to_lat, to_lon = get_airport_coords(row['To'])
-
-        if from_lat and from_lon and to_lat and to_lon:
-            distance = haversine(from_lon, from_lat, to_lon, to_lat)
-            total_distance += distance
-            routes.append((row['From'], row['To'], distance))
-
-        # Calculate flight time
-        flight_time = calculate_flight_time(row['Takeoff_Actual'], row['Landing_Actual'])
-        total_flight_time += flight_time
-
-        # Calculate delays
-        delay = calculate_delay(row['Gate_Departure_Scheduled'], row['Gate_Departure_Actual'])
-        total_delay += delay
+    # Calculate distances for all flights at once
+    from_lat, from_lon = get_airport_coords_arrays(df_active['From'])
+    to_lat, to_lon = get_airport_coords_arrays(df_active['To'])
+    if haversine_nb is not None:
+        distances = np.empty(len(from_lat))
+        haversine_nb(from_lon, from_lat, to_lon, to_lat, distances)
+    else:
+        distances = haversine_vec(from_lon, from_lat, to_lon, to_lat)
+    has_coords = ~np.isnan(distances)
+    total_distance = float(np.nansum(distances))
+    routes = list(zip(
+        df_active['From'].to_numpy()[has_coords],
+        df_active['To'].to_numpy()[has_coords],
+        distances[has_coords].tolist()
+    ))
+
+    # Calculate flight times and delays
+    flight_times = (df_active['Landing_Actual'] - df_active['Takeoff_Actual']).dt.total_seconds().to_numpy() / 3600
+    flight_times = np.where(np.isnan(flight_times), 0, flight_times)
+    delays = (df_active['Gate_Departure_Actual'] - df_active['Gate_Departure_Scheduled']).dt.total_seconds().to_numpy() / 3600
+    delays = np.clip(np.nan_to_num(delays), 0, None)
+    total_flight_time = float(flight_times.sum())
+    total_delay = float(delays.sum())
 
     # Ensure no NaN values in stats
     stats['total_distance'] = round(total_distance, 2) if not pd.isna(total_distance) else 0
@@ -151,44 +190,98 @@ def compute_metrics(df: pd.DataFrame):
     stats['total_delay'] = round(total_delay, 2) if not pd.isna(total_delay) else 0
 
     # Unique airports
-    airports_visited = set()
-    for airport in df_active['From'].dropna():
-        airports_visited.add(airport)
-    for airport in df_active['To'].dropna():
-        airports_visited.add(airport)
-    stats['airports_visited'] = sorted(list(airports_visited))
+    airports_visited = pd.unique(
+        pd.concat([df_active['From'], df_active['To']], ignore_index=True).dropna().to_numpy(dtype=object)
+    )
+    stats['airports_visited'] = tuple(airports_visited)
     stats['total_airports'] = len(airports_visited)
 
     # Airlines
+    # Categorical value_counts also reports categories with no active flights, so drop those
     airlines = df_active['Airline'].dropna().value_counts()
-    stats['airlines'] = airlines.to_dict()
+    airlines = airlines[airlines > 0]
+    stats['airlines'] = airlines.head(10).to_dict()
     stats['total_airlines'] = len(airlines)
     stats['top_airline'] = airlines.index[0] if len(airlines) > 0 else 'N/A'
 
     # Aircraft types
     aircraft = df_active['Aircraft Type Name'].dropna().value_counts()
-    stats['aircraft_types'] = aircraft.to_dict()
+    aircraft = aircraft[aircraft > 0]
+    stats['aircraft_types'] = aircraft.head(10).to_dict()
     stats['most_flown_aircraft'] = aircraft.index[0] if len(aircraft) > 0 else 'N/A'
 
     # Top routes
-    route_counts = Counter()
-    for _, row in df_active.iterrows():
-        if not pd.isna(row['From']) and not pd.isna(row['To']):
-            route = f"{row['From']} → {row['To']}"
-            route_counts[route] += 1
-    stats['top_routes'] = dict(route_counts.most_common(10))
+    route_counts = (df_active.dropna(subset=['From', 'To'])
+                    .groupby(['From', 'To'], observed=True, sort=False)
+                    .size()
+                    .sort_values(ascending=False, kind='stable')
+                    .head(10))
+    stats['top_routes'] = {f"{a} → {b}": int(v) for (a, b), v in route_counts.items()}
 
     # Countries
-    countries = set()
-    for airport in airports_visited:
-        country = get_airport_country(airport)
-        if country:
-            countries.add(country)
-    stats['countries'] = sorted(list(countries))
+    countries = get_airport_countries(airports_visited).dropna().unique()
+    stats['countries'] = tuple(countries)
     stats['total_countries'] = len(countries)
 
     # Store routes for map and flight data for table (active flights only)
     stats['routes'] = routes
     stats['flights_data'] = df_active
 
-    return stats
\ No newline at end of file
+    return stats
+
+
+def register_flights_df(df: pd.DataFrame) -> int:
+    """
+    Register a flights DataFrame for use with compute_metrics_cached.
+
+    Args:
+        df: DataFrame with flight data and a unique index. It should not be modified after registering.
+
+    Returns:
+        int: Key to pass to compute_metrics_cached
+    """
+    df_key = next(_df_keys)
+    _DF_STORE[df_key] = df
+    return df_key
+
+
+def compute_metrics_cached(df_key: int, start_date: str = None, end_date: str = None) -> dict:
+    """
+    Filter a registered DataFrame by date range and compute its metrics, memoized per range.
+
+    Only the stats and the positions of the active rows are cached. A cache hit takes those
+    rows from the registered frame without the parsed datetime columns, which the flight
+    table doesn't use.
+
+    Args:
+        df_key: Key returned by register_flights_df
+        start_date: Start date as string (YYYY-MM-DD) or None for no filter
+        end_date: End date as string (YYYY-MM-DD) or None for no filter
+
+    Returns:
+        dict: Statistics as returned by compute_metrics (a fresh dict on every call)
+    """
+    df = _DF_STORE.get(df_key)
+    if df is None:
+        raise KeyError(f"No flights DataFrame registered under key {df_key}")
+
+    cache_key = (df_key, start_date, end_date)
+    cached = _METRICS_CACHE.get(cache_key)
+    if cached is not None:
+        _METRICS_CACHE.move_to_end(cache_key)
+        stats, active_rows = cached
+        return {**stats, 'flights_data': df.iloc[active_rows]}
+
+    # Uploads are sorted by date, which lets the filter binary search instead of masking
+    date_index = None
+    if 'Date' in df.columns and pd.api.types.is_datetime64_any_dtype(df['Date']) and df['Date'].is_monotonic_increasing:
+        date_index = df['Date'].to_numpy(dtype='datetime64[ns]')
+
+    stats = compute_metrics(filter_flights_by_date_range(df, start_date, end_date, date_index=date_index))
+    flights_data = stats.pop('flights_data')
+
+    _METRICS_CACHE[cache_key] = (stats, df.index.get_indexer(flights_data.index))
+    if len(_METRICS_CACHE) > _METRICS_CACHE_SIZE:
+        _METRICS_CACHE.popitem(last=False)
+
+    return {**stats, 'flights_data': flights_data}
@@ -1,9 +1,16 @@
 # distance calc, airport coords lookup
+import threading
+import numpy as np
 import pandas as pd
 from math import radians, cos, sin, asin, sqrt
 
-# Global variable to store airport data
+# Global variable to store airport data (loaded lazily on first lookup)
 airports_df = None
+# IATA code -> (latitude, longitude) / ISO country, filled in place by load_airports
+AIRPORT_COORDS = {}
+AIRPORT_COUNTRY = {}
+_airports_loaded = False
+_airports_lock = threading.Lock()
 
 
 def haversine(lon1, lat1, lon2, lat2):
@@ -18,35 +25,74 @@ def haversine(lon1, lat1, lon2, lat2):
     return miles
 
 
+def haversine_vec(lon1, lat1, lon2, lat2):
+    """Calculate great circle distances in miles for NumPy arrays of points (specified in decimal degrees)"""
+    lon1, lat1, lon2, lat2 = map(np.radians, [lon1, lat1, lon2, lat2])
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    c = 2 * np.arcsin(np.sqrt(a))
+    km = 6371 * c
+    miles = km * 0.621371
+    return miles
+
+
 def load_airports(csv_path='data/airports.csv'):
     """Load airport data from CSV"""
     global airports_df
     try:
         airports_df = pd.read_csv(csv_path)
+
+        # Build code lookups once (first row wins for duplicate codes)
+        coded = airports_df.dropna(subset=['iata_code']).drop_duplicates('iata_code')
+        AIRPORT_COORDS.clear()
+        AIRPORT_COORDS.update(zip(coded['iata_code'], zip(coded['latitude_deg'].values, coded['longitude_deg'].values)))
+        AIRPORT_COUNTRY.clear()
+        AIRPORT_COUNTRY.update(zip(coded['iata_code'], coded['iso_country']))
         print(f"Loaded {len(airports_df)} airports")
     except Exception as e:
         print(f"Error loading airports: {e}")
 
 
+def _ensure_airports():
+    """Load airport data on first use so server startup doesn't wait on the CSV parse"""
+    global _airports_loaded
+    if _airports_loaded:
+        return
+
+    with _airports_lock:
+        if not _airports_loaded:
+            load_airports()
+            _airports_loaded = True
+
+
 def get_airport_coords(airport_code):
     """Get coordinates for an airport by IATA code"""
+    _ensure_airports()
     if airports_df is None or pd.isna(airport_code):
         return None, None
 
-    airport = airports_df[airports_df['iata_code'] == airport_code]
-    if len(airport) == 0:
-        return None, None
-
-    return airport.iloc[0]['latitude_deg'], airport.iloc[0]['longitude_deg']
+    return AIRPORT_COORDS.get(airport_code, (None, None))
 
 
 def get_airport_country(airport_code):
     """Get country for an airport by IATA code"""
+    _ensure_airports()
     if airports_df is None or pd.isna(airport_code):
         return None
 
-    airport = airports_df[airports_df['iata_code'] == airport_code]
-    if len(airport) == 0:
-        return None
+    return AIRPORT_COUNTRY.get(airport_code)
+
+
+def get_airport_coords_arrays(airport_codes):
+    """Get latitude and longitude arrays for a sequence of IATA codes (NaN where unknown)"""
+    _ensure_airports()
+    missing = (np.nan, np.nan)
+    coords = np.array([AIRPORT_COORDS.get(code, missing) for code in airport_codes], dtype=float).reshape(-1, 2)
+    return coords[:, 0], coords[:, 1]
+
 
-    return airport.iloc[0]['iso_country']
+def get_airport_countries(airport_codes):
+    """Get a Series of ISO country codes for a sequence of IATA codes (NaN where unknown)"""
+    _ensure_airports()
+    return pd.Series(airport_codes, dtype=object).map(AIRPORT_COUNTRY)
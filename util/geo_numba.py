@@ -0,0 +1,18 @@
+# numba-compiled distance kernel (optional, requires numba)
+from math import radians, cos, sin, asin, sqrt
+from numba import njit, prange
+
+
+# fastmath without 'nnan'/'ninf': unknown airports come through as NaN and must stay NaN
+@njit(parallel=True, fastmath={'reassoc', 'contract', 'afn', 'arcp', 'nsz'}, cache=True)
+def haversine_nb(lon1, lat1, lon2, lat2, out):
+    """Calculate great circle distances in miles for arrays of points into out, in parallel"""
+    for i in prange(lon1.shape[0]):
+        rlon1 = radians(lon1[i])
+        rlat1 = radians(lat1[i])
+        rlon2 = radians(lon2[i])
+        rlat2 = radians(lat2[i])
+        dlon = rlon2 - rlon1
+        dlat = rlat2 - rlat1
+        a = sin(dlat/2)**2 + cos(rlat1) * cos(rlat2) * sin(dlon/2)**2
+        out[i] = 6371 * 0.621371 * 2 * asin(sqrt(a))
@@ -1,16 +1,38 @@
 # create/validate share IDs, URLs
+import os
 import secrets
 import string
-import json
+import threading
+import time
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime, timedelta
 from util.storage import save_dataset, load_dataset, dataset_exists, delete_dataset
 
+try:
+    import liburing
+except ImportError:
+    # liburing is optional; bulk share reads fall back to a thread pool
+    liburing = None
+
 
 # Storage directory for share mappings
 SHARE_DIR = Path('data/shares')
 SHARE_DIR.mkdir(parents=True, exist_ok=True)
 
+_SHARE_ID_ALPHABET = string.ascii_letters + string.digits
+
+# In-memory index of share IDs on disk, so existence checks don't need a stat per lookup
+_KNOWN_SHARES = {p.stem for p in SHARE_DIR.glob('*.json')}
+_known_shares_lock = threading.Lock()
+
+# Opt-in io_uring path for bulk share reads (Linux only, needs the liburing package)
+USE_IOURING = os.environ.get('USE_IOURING') == '1' and liburing is not None
+_IOURING_QUEUE_DEPTH = 256
+_IOURING_BUFFER_SIZE = 64 * 1024
+
 
 def generate_share_id(length: int = 8) -> str:
     """
@@ -22,8 +44,195 @@ def generate_share_id(length: int = 8) -> str:
     Returns:
         str: Random alphanumeric share ID
     """
-    alphabet = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    # One CSPRNG draw per batch; bytes >= 248 (largest multiple of 62) are dropped to avoid modulo bias
+    share_id = ''
+    while len(share_id) < length:
+        raw = secrets.token_bytes(length + 4)
+        share_id += ''.join(_SHARE_ID_ALPHABET[b % 62] for b in raw if b < 248)
+    return share_id[:length]
+
+
+@lru_cache(maxsize=1024)
+def _read_share_metadata(share_id: str, mtime_ns: int) -> dict:
+    """Parse a share's metadata file, cached per modification time so edits on disk invalidate it"""
+    return orjson.loads((SHARE_DIR / f'{share_id}.json').read_bytes())
+
+
+def _load_share_metadata(share_id: str) -> dict:
+    """
+    Load a share's metadata through the in-process cache.
+
+    Args:
+        share_id: Share ID
+
+    Returns:
+        dict: Copy of the share metadata, safe for the caller to modify
+    """
+    share_file = SHARE_DIR / f'{share_id}.json'
+    return dict(_read_share_metadata(share_id, share_file.stat().st_mtime_ns))
+
+
+def _add_known_share(share_id: str) -> None:
+    """Record a share ID in the in-memory index"""
+    with _known_shares_lock:
+        _KNOWN_SHARES.add(share_id)
+
+
+def _remove_known_share(share_id: str) -> None:
+    """Drop a share ID from the in-memory index"""
+    with _known_shares_lock:
+        _KNOWN_SHARES.discard(share_id)
+
+
+def _reserve_share_id(share_id: str) -> bool:
+    """
+    Atomically claim a share ID by creating its metadata file as a '{}' placeholder.
+
+    Args:
+        share_id: Share ID to claim
+
+    Returns:
+        bool: True if the ID was free and is now reserved, False if it's already taken
+    """
+    try:
+        fd = os.open(SHARE_DIR / f'{share_id}.json', os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return False
+    try:
+        os.write(fd, b'{}')
+    finally:
+        os.close(fd)
+    return True
+
+
+def _write_share_metadata(share_id: str, metadata: dict, debug: bool = False) -> None:
+    """
+    Atomically write a share's metadata file.
+
+    Args:
+        share_id: Share ID
+        metadata: Share metadata dictionary
+        debug: Pretty-print the JSON for easier inspection (default: False)
+    """
+    share_file = SHARE_DIR / f'{share_id}.json'
+    tmp_file = share_file.with_suffix('.json.tmp')
+    option = orjson.OPT_INDENT_2 if debug else None
+    tmp_file.write_bytes(orjson.dumps(metadata, option=option))
+    os.replace(tmp_file, share_file)
+
+
+def _is_metadata_valid(metadata: dict) -> bool:
+    """
+    Check already-parsed share metadata for being active and not expired.
+
+    Args:
+        metadata: Share metadata dictionary
+
+    Returns:
+        bool: True if the share is active and not expired, False otherwise
+    """
+    if not metadata.get('is_active', True):
+        return False
+
+    return time.time() <= _expiry_timestamp(metadata)
+
+
+def _expiry_timestamp(metadata: dict) -> float:
+    """Get a share's expiry as epoch seconds, parsing the ISO string only for shares created before 'expires_at_ts' was stored"""
+    expires_at_ts = metadata.get('expires_at_ts')
+    if expires_at_ts is None:
+        expires_at_ts = datetime.fromisoformat(metadata['expires_at']).timestamp()
+    return expires_at_ts
+
+
+def _read_share_file(share_path: str) -> dict:
+    """Parse a share metadata file, returning None if it can't be read"""
+    try:
+        with open(share_path, 'rb') as f:
+            return orjson.loads(f.read())
+    except Exception as e:
+        print(f"Error reading share file {os.path.basename(share_path)}: {e}")
+        return None
+
+
+def _read_files_iouring(paths: list) -> list:
+    """
+    Read files through io_uring, submitting up to _IOURING_QUEUE_DEPTH reads per syscall.
+
+    Args:
+        paths: File paths to read
+
+    Returns:
+        list: Raw bytes per path, or None where the read failed or didn't fit the buffer
+    """
+    results = [None] * len(paths)
+    ring = liburing.Ring()
+    cqe = liburing.Cqe()
+    liburing.io_uring_queue_init(_IOURING_QUEUE_DEPTH, ring)
+    try:
+        for start in range(0, len(paths), _IOURING_QUEUE_DEPTH):
+            batch = paths[start:start + _IOURING_QUEUE_DEPTH]
+            fds = []
+            buffers = {}
+            try:
+                for i, path in enumerate(batch):
+                    try:
+                        fd = os.open(path, os.O_RDONLY)
+                    except OSError:
+                        continue  # Left as None; the caller retries it and reports the error
+                    fds.append(fd)
+                    buffers[i] = bytearray(_IOURING_BUFFER_SIZE)
+                    sqe = liburing.io_uring_get_sqe(ring)
+                    liburing.io_uring_prep_read(sqe, fd, buffers[i], 0)
+                    liburing.io_uring_sqe_set_data64(sqe, i)
+
+                if not fds:
+                    continue
+                liburing.io_uring_submit_and_wait(ring, len(fds))
+                for _ in range(len(fds)):
+                    liburing.io_uring_wait_cqe(ring, cqe)
+                    i = liburing.io_uring_cqe_get_data64(cqe[0])
+                    res = cqe[0].res
+                    liburing.io_uring_cqe_seen(ring, cqe[0])
+                    if 0 <= res < _IOURING_BUFFER_SIZE:
+                        results[start + i] = bytes(memoryview(buffers[i])[:res])
+            finally:
+                for fd in fds:
+                    os.close(fd)
+    finally:
+        liburing.io_uring_queue_exit(ring)
+
+    return results
+
+
+def _read_share_files(share_paths: list) -> list:
+    """
+    Read and parse many share metadata files.
+
+    Args:
+        share_paths: Paths of share metadata files
+
+    Returns:
+        list: Parsed metadata per path, or None for files that couldn't be read
+    """
+    if USE_IOURING:
+        try:
+            raw_files = _read_files_iouring(share_paths)
+            all_metadata = []
+            for share_path, raw in zip(share_paths, raw_files):
+                try:
+                    # Anything io_uring couldn't read whole goes through the regular path
+                    all_metadata.append(orjson.loads(raw) if raw is not None else _read_share_file(share_path))
+                except orjson.JSONDecodeError as e:
+                    print(f"Error reading share file {os.path.basename(share_path)}: {e}")
+                    all_metadata.append(None)
+            return all_metadata
+        except Exception as e:
+            print(f"io_uring read failed, falling back to thread pool: {e}")
+
+    # Read and parse the files in parallel; file IO and orjson release the GIL
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        return list(executor.map(_read_share_file, share_paths))
 
 
 def cleanup_expired_shares() -> int:
@@ -37,18 +246,17 @@ def cleanup_expired_shares() -> int:
     try:
         for share_file in SHARE_DIR.glob('*.json'):
             try:
-                with open(share_file, 'r') as f:
-                    metadata = json.load(f)
+                metadata = orjson.loads(share_file.read_bytes())
 
                 # Check if share is expired
-                expires_at = datetime.fromisoformat(metadata['expires_at'])
-                if datetime.now() > expires_at:
+                if time.time() > _expiry_timestamp(metadata):
                     share_id = metadata['share_id']
 
                     # Delete the dataset
                     if delete_dataset(share_id):
                         # Delete the share metadata file
                         share_file.unlink()
+                        _remove_known_share(share_id)
                         print(f"Deleted expired share: {share_id}")
                         deleted_count += 1
                     else:
@@ -85,13 +293,14 @@ def create_share(flights_df, stats, expiry_days: int = 30, owner_name: str = Non
     # Clean up expired shares before creating a new one
     cleanup_expired_shares()
 
-    # Generate unique share ID
+    # Generate unique share ID, reserving it on disk so no other worker can take it
     share_id = generate_share_id()
-    while share_exists(share_id):
+    while not _reserve_share_id(share_id):
         share_id = generate_share_id()
 
     # Save the dataset using the share ID
     if not save_dataset(share_id, flights_df, stats):
+        (SHARE_DIR / f'{share_id}.json').unlink(missing_ok=True)
         return None
 
     # Create share metadata
@@ -100,6 +309,7 @@ def create_share(flights_df, stats, expiry_days: int = 30, owner_name: str = Non
         'share_id': share_id,
         'created_at': datetime.now().isoformat(),
         'expires_at': expiry_date.isoformat(),
+        'expires_at_ts': expiry_date.timestamp(),
         'total_flights': len(flights_df),
         'is_active': True,
         'owner_name': owner_name if owner_name else None,
@@ -108,9 +318,8 @@ def create_share(flights_df, stats, expiry_days: int = 30, owner_name: str = Non
     }
 
     # Save share metadata
-    share_file = SHARE_DIR / f'{share_id}.json'
-    with open(share_file, 'w') as f:
-        json.dump(share_metadata, f, indent=2)
+    _write_share_metadata(share_id, share_metadata)
+    _add_known_share(share_id)
 
     print(f"Share created: {share_id}")
     return share_id
@@ -130,18 +339,9 @@ def validate_share_id(share_id: str) -> bool:
         return False
 
     try:
-        share_file = SHARE_DIR / f'{share_id}.json'
-        with open(share_file, 'r') as f:
-            metadata = json.load(f)
-
-        # Check if share is active
-        if not metadata.get('is_active', True):
-            return False
-
-        # Check expiry
-        expires_at = datetime.fromisoformat(metadata['expires_at'])
-        if datetime.now() > expires_at:
-            print(f"Share {share_id} has expired")
+        metadata = _load_share_metadata(share_id)
+        if not _is_metadata_valid(metadata):
+            print(f"Share {share_id} is inactive or has expired")
             return False
 
         return True
@@ -191,8 +391,15 @@ def share_exists(share_id: str) -> bool:
     Returns:
         bool: True if share exists, False otherwise
     """
-    share_file = SHARE_DIR / f'{share_id}.json'
-    return share_file.exists() and dataset_exists(share_id)
+    if share_id not in _KNOWN_SHARES:
+        # Fall back to disk for shares created by another worker process
+        try:
+            os.stat(SHARE_DIR / f'{share_id}.json')
+        except (FileNotFoundError, NotADirectoryError):
+            return False
+        _add_known_share(share_id)
+
+    return dataset_exists(share_id)
 
 
 def deactivate_share(share_id: str) -> bool:
@@ -211,14 +418,12 @@ def deactivate_share(share_id: str) -> bool:
 
     try:
         share_file = SHARE_DIR / f'{share_id}.json'
-        with open(share_file, 'r') as f:
-            metadata = json.load(f)
+        metadata = orjson.loads(share_file.read_bytes())
 
         metadata['is_active'] = False
         metadata['deactivated_at'] = datetime.now().isoformat()
 
-        with open(share_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        _write_share_metadata(share_id, metadata)
 
         print(f"Share {share_id} deactivated")
         return True
@@ -241,9 +446,7 @@ def get_share_info(share_id: str) -> dict:
         return None
 
     try:
-        share_file = SHARE_DIR / f'{share_id}.json'
-        with open(share_file, 'r') as f:
-            return json.load(f)
+        return _load_share_metadata(share_id)
     except Exception as e:
         print(f"Error getting share info for {share_id}: {e}")
         return None
@@ -258,13 +461,18 @@ def list_active_shares() -> list:
     """
     active_shares = []
     try:
-        for share_file in SHARE_DIR.glob('*.json'):
-            with open(share_file, 'r') as f:
-                metadata = json.load(f)
+        # scandir gets names and file types from the directory listing without a stat per entry
+        with os.scandir(SHARE_DIR) as entries:
+            share_paths = [entry.path for entry in entries if entry.name.endswith('.json') and entry.is_file()]
+        all_metadata = _read_share_files(share_paths)
 
-            share_id = metadata['share_id']
-            if validate_share_id(share_id):
-                active_shares.append(metadata)
+        # Check validity on the parsed dicts, then stat datasets only for the survivors
+        for metadata in all_metadata:
+            try:
+                if metadata and _is_metadata_valid(metadata) and dataset_exists(metadata['share_id']):
+                    active_shares.append(metadata)
+            except Exception as e:
+                print(f"Error checking share {metadata.get('share_id')}: {e}")
     except Exception as e:
         print(f"Error listing active shares: {e}")
 
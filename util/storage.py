@@ -1,15 +1,23 @@
 # save/load per-user datasets (files/db)
+import mmap
 import os
-import json
 import pickle
+import shutil
 from pathlib import Path
+import orjson
 import pandas as pd
+import pyarrow as pa
 
 
 # Storage directory for user datasets
 STORAGE_DIR = Path('data/user_datasets')
 STORAGE_DIR.mkdir(parents=True, exist_ok=True)
 
+# Single-file dataset format: flights as an Arrow IPC table, stats and metadata in its schema metadata
+DATASET_FILE = 'dataset.arrow'
+# Files used by datasets saved before DATASET_FILE, and by the CSV fallback
+LEGACY_FILES = ('flights.parquet', 'flights.csv', 'stats.pkl', 'stats.json', 'metadata.json')
+
 
 def save_dataset(dataset_id: str, flights_df: pd.DataFrame, stats: dict) -> bool:
     """
@@ -27,25 +35,26 @@ def save_dataset(dataset_id: str, flights_df: pd.DataFrame, stats: dict) -> bool
         dataset_path = STORAGE_DIR / dataset_id
         dataset_path.mkdir(exist_ok=True)
 
-        # Save the DataFrame as CSV
-        flights_df.to_csv(dataset_path / 'flights.csv', index=False)
-
         # Save stats (without the DataFrame inside it)
         stats_copy = stats.copy()
         if 'flights_data' in stats_copy:
             del stats_copy['flights_data']  # Don't duplicate the DataFrame
 
-        with open(dataset_path / 'stats.json', 'w') as f:
-            json.dump(stats_copy, f, indent=2, default=str)
-
-        # Save metadata
         metadata = {
             'dataset_id': dataset_id,
             'total_flights': len(flights_df),
             'created_at': pd.Timestamp.now().isoformat()
         }
-        with open(dataset_path / 'metadata.json', 'w') as f:
-            json.dump(metadata, f, indent=2)
+
+        # Bundle flights, stats and metadata into one Arrow IPC file, falling back to
+        # separate files for columns pyarrow can't type (e.g. mixed object columns)
+        try:
+            _write_arrow_dataset(dataset_path, flights_df, stats_copy, metadata)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            print(f"Falling back to CSV for dataset {dataset_id}: {e}")
+            flights_df.to_csv(dataset_path / 'flights.csv', index=False)
+            (dataset_path / 'stats.pkl').write_bytes(_dump_stats(stats_copy))
+            (dataset_path / 'metadata.json').write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
 
         print(f"Dataset {dataset_id} saved successfully")
         return True
@@ -54,31 +63,87 @@ def save_dataset(dataset_id: str, flights_df: pd.DataFrame, stats: dict) -> bool
         return False
 
 
-def load_dataset(dataset_id: str) -> tuple:
+class LoadedDataset:
+    """A saved dataset whose stats are read up front and whose flights DataFrame is read on first access"""
+
+    def __init__(self, dataset_path: Path, stats: dict):
+        self._path = dataset_path
+        self.stats = stats
+        self._flights_df = None
+
+    @property
+    def path(self) -> Path:
+        """Directory the dataset is stored in"""
+        return self._path
+
+    @property
+    def flights_df(self) -> pd.DataFrame:
+        """DataFrame containing flight data, read from disk the first time it's used"""
+        if self._flights_df is None:
+            self._flights_df = _read_flights(self._path)
+        return self._flights_df
+
+
+def open_dataset(dataset_id: str) -> LoadedDataset:
     """
-    Load a previously saved flight dataset and its statistics.
+    Open a saved dataset, reading only its statistics until the flights are needed.
 
     Args:
-        dataset_id: Unique identifier for the dataset to load
+        dataset_id: Unique identifier for the dataset to open
 
     Returns:
-        tuple: (flights_df, stats) or (None, None) if not found
+        LoadedDataset: Lazily loaded dataset, or None if not found
     """
     try:
         dataset_path = STORAGE_DIR / dataset_id
 
         if not dataset_path.exists():
             print(f"Dataset {dataset_id} not found")
-            return None, None
+            return None
+
+        return LoadedDataset(dataset_path, _read_stats(dataset_path))
+    except Exception as e:
+        print(f"Error opening dataset {dataset_id}: {e}")
+        return None
+
+
+def load_dataset_stats_only(dataset_id: str) -> dict:
+    """
+    Load a saved dataset's statistics without reading its flights.
+
+    Args:
+        dataset_id: Unique identifier for the dataset
+
+    Returns:
+        dict: Statistics (without 'flights_data'), or None if not found
+    """
+    dataset = open_dataset(dataset_id)
+    return dataset.stats if dataset else None
+
+
+def load_dataset(dataset_id: str) -> tuple:
+    """
+    Load a previously saved flight dataset and its statistics.
+
+    Args:
+        dataset_id: Unique identifier for the dataset to load
+
+    Returns:
+        tuple: (flights_df, stats) or (None, None) if not found
+    """
+    dataset = open_dataset(dataset_id)
+    if dataset is None:
+        return None, None
 
-        # Load the DataFrame
-        flights_df = pd.read_csv(dataset_path / 'flights.csv')
+    try:
+        flights_df = dataset.flights_df
 
-        # Load stats
-        with open(dataset_path / 'stats.json', 'r') as f:
-            stats = json.load(f)
+        # Datasets saved before the single-file format are rewritten as one
+        if not (dataset.path / DATASET_FILE).exists():
+            _migrate_to_arrow(dataset.path, flights_df, dataset.stats)
 
         # Add the DataFrame back to stats
+        stats = dict(dataset.stats)
         stats['flights_data'] = flights_df
 
         print(f"Dataset {dataset_id} loaded successfully")
@@ -88,6 +153,123 @@ def load_dataset(dataset_id: str) -> tuple:
         return None, None
 
 
+def _read_flights(dataset_path: Path) -> pd.DataFrame:
+    """Read a dataset's flights from the Arrow file, or from the parquet/CSV of older datasets"""
+    arrow_path = dataset_path / DATASET_FILE
+    if arrow_path.exists():
+        with pa.memory_map(str(arrow_path), 'r') as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+
+    parquet_path = dataset_path / 'flights.parquet'
+    if parquet_path.exists():
+        return pd.read_parquet(parquet_path, engine='pyarrow')
+    return pd.read_csv(dataset_path / 'flights.csv')
+
+
+def _read_stats(dataset_path: Path) -> dict:
+    """Read a dataset's stats from the Arrow file footer, or from stats.pkl/stats.json of older datasets"""
+    arrow_path = dataset_path / DATASET_FILE
+    if arrow_path.exists():
+        with pa.memory_map(str(arrow_path), 'r') as source:
+            schema_metadata = pa.ipc.open_file(source).schema.metadata
+        if b'stats_pickle' in schema_metadata:
+            return pickle.loads(schema_metadata[b'stats_pickle'])
+        return orjson.loads(schema_metadata[b'stats'])  # Written before stats were pickled
+
+    pickle_path = dataset_path / 'stats.pkl'
+    if pickle_path.exists():
+        return pickle.loads(pickle_path.read_bytes())
+    return _load_stats_json(dataset_path / 'stats.json')
+
+
+def _dump_stats(stats: dict) -> bytes:
+    """
+    Serialize stats with pickle protocol 5 so numpy values and Timestamps round-trip unchanged.
+
+    Only ever unpickled from files this server wrote itself, never from user input.
+    """
+    return pickle.dumps(_to_builtin(stats), protocol=5)
+
+
+def _to_builtin(value):
+    """
+    Recursively copy dict/list/tuple subclasses into plain dicts, lists and tuples.
+
+    Stats kept in app.storage come back as NiceGUI observables, which would otherwise be
+    pickled by class and tie saved datasets to NiceGUI's internals.
+    """
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_to_builtin(v) for v in value)
+    return value
+
+
+def _write_arrow_dataset(dataset_path: Path, flights_df: pd.DataFrame, stats: dict, metadata: dict) -> None:
+    """
+    Atomically write flights as an Arrow IPC file with stats and metadata in the schema metadata.
+
+    Args:
+        dataset_path: Dataset directory
+        flights_df: DataFrame containing flight data
+        stats: Dictionary of computed statistics, without the DataFrame
+        metadata: Dataset metadata dictionary
+    """
+    table = pa.Table.from_pandas(flights_df)
+    # Keep pyarrow's pandas metadata so dtypes and the index round-trip
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[b'stats_pickle'] = _dump_stats(stats)
+    schema_metadata[b'meta'] = orjson.dumps(metadata)
+    table = table.replace_schema_metadata(schema_metadata)
+
+    arrow_path = dataset_path / DATASET_FILE
+    tmp_path = arrow_path.with_suffix('.arrow.tmp')
+    try:
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, arrow_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _read_arrow_metadata(arrow_path: Path) -> dict:
+    """Read a dataset's metadata from the Arrow file footer without loading any record batches"""
+    with pa.memory_map(str(arrow_path), 'r') as source:
+        return orjson.loads(pa.ipc.open_file(source).schema.metadata[b'meta'])
+
+
+def _load_stats_json(stats_path: Path) -> dict:
+    """Parse stats.json straight from a read-only memory map, skipping the intermediate bytes copy"""
+    with open(stats_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()  # The map can't close while a view is exported
+
+
+def _migrate_to_arrow(dataset_path: Path, flights_df: pd.DataFrame, stats: dict) -> None:
+    """Rewrite a multi-file dataset as a single Arrow file so later loads read one file (best effort)"""
+    try:
+        metadata = orjson.loads((dataset_path / 'metadata.json').read_bytes())
+        _write_arrow_dataset(dataset_path, flights_df, stats, metadata)
+    except Exception as e:
+        print(f"Could not migrate dataset {dataset_path.name} to Arrow: {e}")
+        return
+
+    # The Arrow file now holds everything; leftover legacy files are ignored by later loads
+    for legacy_file in LEGACY_FILES:
+        try:
+            (dataset_path / legacy_file).unlink(missing_ok=True)
+        except OSError as e:
+            print(f"Could not remove {legacy_file} from dataset {dataset_path.name}: {e}")
+
+
 def list_datasets() -> list:
     """
     List all saved datasets.
@@ -99,11 +281,12 @@ def list_datasets() -> list:
     try:
         for dataset_dir in STORAGE_DIR.iterdir():
             if dataset_dir.is_dir():
+                arrow_path = dataset_dir / DATASET_FILE
                 metadata_file = dataset_dir / 'metadata.json'
-                if metadata_file.exists():
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
-                        datasets.append(metadata)
+                if arrow_path.exists():
+                    datasets.append(_read_arrow_metadata(arrow_path))
+                elif metadata_file.exists():
+                    datasets.append(orjson.loads(metadata_file.read_bytes()))
     except Exception as e:
         print(f"Error listing datasets: {e}")
 
@@ -127,12 +310,8 @@ def delete_dataset(dataset_id: str) -> bool:
             print(f"Dataset {dataset_id} not found")
             return False
 
-        # Delete all files in the dataset directory
-        for file in dataset_path.iterdir():
-            file.unlink()
-
-        # Delete the directory itself
-        dataset_path.rmdir()
+        # Delete the dataset directory and everything in it
+        shutil.rmtree(dataset_path)
 
         print(f"Dataset {dataset_id} deleted successfully")
         return True
@@ -151,5 +330,12 @@ def dataset_exists(dataset_id: str) -> bool:
     Returns:
         bool: True if dataset exists, False otherwise
     """
+    # One stat for current datasets; only a miss also checks the older multi-file layout
     dataset_path = STORAGE_DIR / dataset_id
-    return dataset_path.exists() and (dataset_path / 'metadata.json').exists()
+    for marker in (DATASET_FILE, 'metadata.json'):
+        try:
+            os.stat(dataset_path / marker)
+            return True
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return False
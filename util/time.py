@@ -1,6 +1,30 @@
 # time formatting, durations
+from datetime import timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 from airportsdata import load
-import pytz
+import pandas as pd
+
+# Airport databases are parsed once at import and flattened into a single code -> timezone
+# name map; IATA entries are merged last so they win over ICAO codes that collide with them
+_CODE_TO_TZNAME = {
+    code: info['tz']
+    for airports in (load('ICAO'), load('IATA'))
+    for code, info in airports.items()
+    if info.get('tz')
+}
+
+
+@lru_cache(maxsize=None)
+def _get_tz(tzname):
+    """Get a (cached) zoneinfo timezone by name"""
+    return ZoneInfo(tzname)
+
+
+def _lookup_tzname(airport_code):
+    """Get the timezone name for an IATA or ICAO airport code, or None if unknown"""
+    return _CODE_TO_TZNAME.get(airport_code.upper())
+
 
 def local_to_utc(local_time, airport_code):
     """
@@ -14,26 +38,38 @@ def local_to_utc(local_time, airport_code):
         datetime: UTC datetime (naive, without tzinfo).
     """
 
-    airports = load('IATA')  # defaults to IATA codes, switches to ICAO if needed
-    code = airport_code.upper()
-
-    # Try IATA, then ICAO if not found
-    tzname = None
-    info = airports.get(code)
-    if info and 'timezone' in info and info['timezone']:
-        tzname = info['timezone']
-    else:
-        airports_icao = load('ICAO')
-        info = airports_icao.get(code)
-        if info and 'timezone' in info and info['timezone']:
-            tzname = info['timezone']
-
+    tzname = _lookup_tzname(airport_code)
     if not tzname:
         raise ValueError(f"Timezone not found for airport code '{airport_code}'")
 
-    tz = pytz.timezone(tzname)
-    # Localize and convert to UTC
-    local_dt = tz.localize(local_time)
-    utc_dt = local_dt.astimezone(pytz.utc)
-    # Return as naive UTC for compatibility with most code
-    return utc_dt.replace(tzinfo=None)
\ No newline at end of file
+    tz = _get_tz(tzname)
+    # Attach the zone, convert to UTC and return as naive UTC for compatibility with most code
+    return local_time.replace(tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def local_to_utc_batch(times, airport_codes):
+    """
+    Convert a Series of naive local datetimes to UTC, one vectorized conversion per airport.
+
+    Args:
+        times (pd.Series): Naive local datetimes (or strings parseable by pd.to_datetime).
+        airport_codes (pd.Series): ICAO or IATA airport codes, aligned with times.
+
+    Returns:
+        pd.Series: Naive UTC datetimes. Rows with an unknown airport, or a local time that
+            is ambiguous or nonexistent at a DST transition, are NaT.
+    """
+    local_times = pd.to_datetime(times, errors='coerce')
+    utc_times = pd.Series(pd.NaT, index=local_times.index, dtype='datetime64[ns]')
+
+    for code, idx in airport_codes.groupby(airport_codes, observed=True).groups.items():
+        tzname = _lookup_tzname(str(code))
+        if not tzname:
+            continue
+
+        utc_times.loc[idx] = (local_times.loc[idx]
+                              .dt.tz_localize(_get_tz(tzname), ambiguous='NaT', nonexistent='NaT')
+                              .dt.tz_convert('UTC')
+                              .dt.tz_localize(None))
+
+    return utc_times